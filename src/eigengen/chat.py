@@ -1,32 +1,43 @@
-import os
+import functools
 import sys
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from prompt_toolkit import PromptSession
 from prompt_toolkit.styles import Style
-from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
 
 from prompt_toolkit.formatted_text import FormattedText
 from prompt_toolkit.shortcuts import print_formatted_text
-from pygments.token import Token
 
-import pygments.style
-
-from eigengen import operations, utils, keybindings, meld, providers, prompts
+from eigengen import operations, utils, keybindings, providers, prompts
 from eigengen.progress import ProgressIndicator
 from eigengen.config import EggConfig
 from eigengen.providers import MODEL_CONFIGS
 
-class CustomStyle(pygments.style.Style):
-    default_style = ""
-    styles = {
-        Token.Keyword: 'ansigreen',
-        Token.String: 'ansiyellow',
-        Token.Comment: 'ansiblue',
-        Token.Name: '',
-        # Add more token styles as desired
-    }
+# styles of the chat message headers
+CHAT_STYLE = Style.from_dict({
+    "user": "ansicyan",
+    "assistant": "ansigreen"
+})
+
+# format of the timestamps in the chat message headers
+TIMESTAMP_FORMAT = '%I:%M:%S %p'
+
+USER_PROMPT_FORMAT = "\n[{}][User] >\n"
+
+
+@functools.lru_cache(maxsize=1)
+def _user_prompt_message_at(second: int):
+    timestamp = datetime.fromtimestamp(second).strftime(TIMESTAMP_FORMAT)
+    return [("class:user", USER_PROMPT_FORMAT.format(timestamp))]
+
+
+def user_prompt_message():
+    """Returns the prompt message for the user's turn, showing the current time."""
+    # prompt_toolkit calls this on every redraw, the text only changes once a second
+    return _user_prompt_message_at(int(time.time()))
+
 
 CHAT_HELP = (
     "Available commands:\n\n"
@@ -49,28 +60,36 @@ CHAT_HELP = (
 )
 
 class EggChat:
+    # names of the models that can be selected with /model
+    _SUPPORTED_MODELS = tuple(MODEL_CONFIGS)
+
     def __init__(self,
                  config: EggConfig,
                  user_files: Optional[List[str]]):
         self.config = config  # Store the passed config
         self.model_pair = providers.create_model_pair(config.model)
         self.mode = config.args.chat_mode
+        # system prompt of the current mode, updated when the mode changes
+        self.system_prompt = prompts.get_prompt(self.mode)
         self.quoting_state = {
             "current_index": -1,
             "code_blocks": None,
             "cycle_iterator": None
         }
         self.messages: List[Dict[str, str]] = []
+        # index of the latest assistant message in self.messages, -1 if there is none
+        self._last_assistant_idx = -1
+        # code blocks parsed from the latest assistant message, None until needed
+        self._last_code_blocks: Optional[List[Tuple[str, str, str, str, int, int]]] = None
+        # shown while waiting for the answer, reused for every turn
+        self._indicator = ProgressIndicator()
         self.pre_fill = ""
 
         relevant_files = user_files
         self.file_content = ""
         if relevant_files:
-            for fname in relevant_files:
-                if os.path.exists(fname):
-                    with open(fname, 'r') as f:
-                        content = f.read()
-                    self.file_content += "\n" + utils.encode_code_block(content, fname)
+            self.file_content = "".join("\n" + utils.encode_code_block(content, fname)
+                                        for fname, content in utils.read_existing_files(relevant_files))
 
         self.kbm = keybindings.ChatKeyBindingsManager(self.quoting_state, self.messages)
 
@@ -84,6 +103,9 @@ class EggChat:
         Args:
             initial_prompt (Optional[str], optional): Pre-filled prompt content. Defaults to None.
         """
+        # pyperclip is only needed once there is a prompt to copy from
+        from prompt_toolkit.clipboard.pyperclip import PyperclipClipboard
+
         session = PromptSession(key_bindings=self.kbm.get_kb(), clipboard=PyperclipClipboard())
         print(
             "Entering Chat Mode. Type '/help' for available commands.\n"
@@ -94,17 +116,9 @@ class EggChat:
 
         while True:
             try:
-                style = Style.from_dict({
-                    "user": "ansicyan",
-                    "assistant": "ansigreen"
-                })
-
-                def custom_prompt():
-                    return [("class:user", f"\n[{datetime.now().strftime('%I:%M:%S %p')}][User] >\n")]
-
                 prompt_input = session.prompt(
-                    custom_prompt,
-                    style=style,
+                    user_prompt_message,
+                    style=CHAT_STYLE,
                     multiline=True,
                     enable_history_search=True,
                     refresh_interval=5,
@@ -120,36 +134,41 @@ class EggChat:
                 if prompt_input.strip() == '':
                     continue
 
-                message_content = prompt_input
                 if self.file_content and self.file_content.strip() != "":
-                    message_content += "\n" + self.file_content
+                    # Send the file content as its own message ahead of the first prompt. The files are
+                    # then a stable conversation prefix that provider side prompt caching can reuse.
+                    self.messages.append({"role": "user", "content": self.file_content})
+                    self.messages.append({"role": "assistant", "content": "ok"})
+                    self.kbm.context_message_count = len(self.messages)
                     # clear file content after use so we only include it once
                     self.file_content = ""
 
                 # Process the user's input
-                self.messages.append({"role": "user", "content": message_content})
-                answer = ""
+                self.messages.append({"role": "user", "content": prompt_input})
+                answer_chunks: List[str] = []
 
                 # Initialize and start the progress indicator
-                with ProgressIndicator() as _:
+                with self._indicator:
                     chunk_iterator = operations.process_request(self.model_pair.large,
                                                                 self.messages,
-                                                                prompts.get_prompt(self.mode))
+                                                                self.system_prompt)
                     for chunk in chunk_iterator:
-                        answer += chunk
+                        answer_chunks.append(chunk)
+                answer = "".join(answer_chunks)
 
                 # print assistant response heading + timestamp
-                timestamp = datetime.now().strftime('%I:%M:%S %p')
-                print_formatted_text(FormattedText([("class:assistant", f"\n[{timestamp}][Assistant] >")]), style=style)
-
-                # Get the formatted response
-                formatted_response = utils.get_formatted_response_with_syntax_highlighting(self.config.color_scheme, answer)
+                timestamp = datetime.now().strftime(TIMESTAMP_FORMAT)
+                print_formatted_text(FormattedText([("class:assistant", f"\n[{timestamp}][Assistant] >")]), style=CHAT_STYLE)
 
-                # Pipe the formatted response via pager
+                # Format the response and pipe it via pager as it is being formatted
+                formatted_response = utils.iter_formatted_response_with_syntax_highlighting(self.config.color_scheme,
+                                                                                            answer)
                 utils.pipe_output_via_pager(formatted_response)
                 print("")  # empty line to create a bit of separation
 
                 self.messages.append({"role": "assistant", "content": answer})
+                self._last_assistant_idx = len(self.messages) - 1
+                self._last_code_blocks = None
 
             except KeyboardInterrupt:
                 # Handle Ctrl+C to cancel the current input
@@ -159,25 +178,32 @@ class EggChat:
                 # Handle Ctrl+D to exit
                 break
 
+    # command name -> name of the method handling it
+    _COMMANDS: Dict[str, str] = {
+        '/help': 'handle_help',
+        '/quote': 'handle_quote',
+        '/reset': 'handle_reset',
+        '/meld': 'handle_meld',
+        '/model': 'handle_model',
+        '/mode': 'handle_mode',
+        '/exit': 'handle_exit'
+    }
+
     def handle_command(self, prompt_input: str) -> bool:
         command, *args = prompt_input.strip().split(maxsplit=1)
 
-        def _unknown_command() -> bool:
-            print(f"Unknown command {command}")
-            return True
-
-        handler = {
-            '/help': self.handle_help,
-            '/quote': self.handle_quote,
-            '/reset': self.handle_reset,
-            '/meld': self.handle_meld,
-            '/model': self.handle_model,
-            '/mode': self.handle_mode,
-            '/exit': self.handle_exit
-        }.get(command, _unknown_command)
+        handler_name = self._COMMANDS.get(command)
+        if handler_name is None:
+            return self.handle_unknown_command(command)
 
+        handler = getattr(self, handler_name)
         return handler(*args) if args else handler()
 
+    def handle_unknown_command(self, command: str) -> bool:
+        """Handle a command that is not recognized."""
+        print(f"Unknown command {command}")
+        return True
+
 
     def handle_help(self) -> bool:
         """Handle the /help command."""
@@ -186,40 +212,48 @@ class EggChat:
 
     def handle_quote(self, file_to_quote: str) -> bool:
         """Handle the /quote command."""
-        if os.path.exists(file_to_quote):
-            with open(file_to_quote, 'r') as f:
-                content = f.read()
-            # Prefix each line with '> '
-            quoted_content = '\n'.join(f'> {line}' for line in content.splitlines())
-            self.pre_fill = quoted_content  # Pre-fill the next prompt with quoted content
-        else:
+        try:
+            content = utils.read_file_cached(file_to_quote)
+        except FileNotFoundError:
             print(f"File '{file_to_quote}' not found.\n")
+            return True
+        # Prefix each line with '> '
+        quoted_content = utils.quote_text(content)
+        self.pre_fill = quoted_content  # Pre-fill the next prompt with quoted content
         return True
 
     def handle_reset(self) -> bool:
         """Handle the /reset command."""
-        self.messages = []
+        # clear in place, the key bindings manager holds a reference to the same list
+        self.messages.clear()
+        self._last_assistant_idx = -1
+        self._last_code_blocks = None
+        self.kbm.context_message_count = 0
         print("Chat messages cleared.\n")
         return True
 
     def handle_meld(self, paths_input: Optional[str] = None) -> bool:
         """Handle the /meld command."""
-        last_assistant_message = next(
-            (msg["content"] for msg in reversed(self.messages) if msg["role"] == "assistant"), ""
-        )
+        # meld is only needed once the user asks for it
+        from eigengen import meld
+
+        last_assistant_message = (self.messages[self._last_assistant_idx]["content"]
+                                  if self._last_assistant_idx >= 0 else "")
+        # parse the code blocks once per answer, the same answer is often melded a file at a time
+        if self._last_code_blocks is None:
+            self._last_code_blocks = utils.extract_code_blocks(last_assistant_message)
+        code_blocks = self._last_code_blocks
 
         if not paths_input:
             # No paths provided, extract file paths from the last assistant message's code blocks
-            code_blocks = utils.extract_code_blocks(last_assistant_message)
-            paths = {path for _, _, path, _, _, _ in code_blocks if path}
+            paths = {block_path for _, _, block_path, _, _, _ in code_blocks if block_path}
             if not paths:
                 print("No file paths found in the latest assistant message.\n")
                 return True
         else:
             paths = set(paths_input.split())
 
-        for filepath in paths:
-            meld.meld_changes(self.model_pair.small, filepath, last_assistant_message)
+        meld.meld_files(self.model_pair.small, sorted(paths), last_assistant_message, code_blocks)
 
         return True
 
@@ -228,8 +262,7 @@ class EggChat:
 
         def print_supported_models():
             print("Supported models:")
-            supported_models = list(MODEL_CONFIGS.keys())
-            for m in supported_models:
+            for m in self._SUPPORTED_MODELS:
                 print(f" - {m}")
 
         if not args:
@@ -255,7 +288,9 @@ class EggChat:
         else:
             new_mode = args[0].strip()
             if new_mode in ["general", "architect", "programmer"]:
-                self.mode = new_mode
+                if new_mode != self.mode:
+                    self.mode = new_mode
+                    self.system_prompt = prompts.get_prompt(new_mode)
                 print(f"Mode switched to: {new_mode}")
             else:
                 print(f"Unsupported mode: {new_mode}")
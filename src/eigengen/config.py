@@ -2,13 +2,33 @@ import argparse
 import os
 import json
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, Optional
+
+
+def _valid_requests_per_minute(value: Any) -> Dict[str, int]:
+    """
+    Returns the entries of a requests_per_minute setting that map a provider name to a positive integer.
+    Invalid entries are dropped with a warning.
+    """
+    if not isinstance(value, dict):
+        print(f"Ignoring requests_per_minute in config file: expected an object, got {value!r}.")
+        return {}
+    limits: Dict[str, int] = {}
+    for name, limit in value.items():
+        if isinstance(limit, int) and not isinstance(limit, bool) and limit > 0:
+            limits[name] = limit
+        else:
+            print(f"Ignoring requests_per_minute for '{name}' in config file: expected a positive integer, got {limit!r}.")
+    return limits
+
 
 @dataclass
 class EggConfig:
     model: str = "claude"
     editor: str = "nano"
     color_scheme: str = "github-dark"
+    # client-side requests per minute limit per provider name, e.g. {"google": 10}
+    requests_per_minute: Dict[str, int] = field(default_factory=dict)
 
     # command line arguments are carried here but not stored in config file
     args: argparse.Namespace = field(default_factory=lambda: argparse.Namespace())
@@ -22,18 +42,18 @@ class EggConfig:
         if config_path is None:
             config_path = os.path.expanduser("~/.eigengen/config.json")
         
-        if not os.path.exists(config_path):
-            return EggConfig()
-        
         try:
-            with open(config_path, 'r') as f:
+            with open(config_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
             return EggConfig(
                 model=data.get("model", "claude"),
                 editor=data.get("editor", "nano"),
                 color_scheme=data.get("color_scheme", "github-dark"),
+                requests_per_minute=_valid_requests_per_minute(data.get("requests_per_minute", {})),
                 args=argparse.Namespace()
             )
+        except FileNotFoundError:
+            return EggConfig()
         except Exception as e:
             print(f"Error loading config file '{config_path}': {e}. Using default configuration.")
             return EggConfig()
@@ -46,11 +66,12 @@ class EggConfig:
             config_path = os.path.expanduser("~/.eigengen/config.json")
         
         try:
-            with open(config_path, 'w') as f:
+            with open(config_path, 'w', encoding='utf-8') as f:
                 json.dump({
                     "model": self.model,
                     "editor": self.editor,
-                    "color_scheme": self.color_scheme
+                    "color_scheme": self.color_scheme,
+                    "requests_per_minute": self.requests_per_minute
                 }, f, indent=4)
             print(f"Configuration saved to {config_path}.")
         except Exception as e:
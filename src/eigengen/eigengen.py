@@ -9,7 +9,7 @@ from typing import Optional
 import argparse
 
 from eigengen.providers import MODEL_CONFIGS
-from eigengen import operations, log, chat, utils
+from eigengen import operations, log, providers, utils
 from eigengen.config import EggConfig  # Add this import
 
 def parse_arguments() -> argparse.Namespace:
@@ -53,17 +53,14 @@ def handle_modes(config: EggConfig) -> None:
         log.list_prompt_history(config.args.list_history)
         return
 
-    # Initialize file lists
-    user_files = config.args.files
-
-    # Combine user files and git files
-    combined_files = set()
-    if user_files:
-        combined_files.update(user_files)
+    # Initialize file lists, each file is read and sent only once
+    user_files = utils.unique_paths(config.args.files or [])
 
     if config.args.chat or config.args.prompt is None:
-        # Enter chat mode if --chat is specified or no prompt is provided
-        egg_chat = chat.EggChat(config, list(user_files or []))
+        # Enter chat mode if --chat is specified or no prompt is provided.
+        # Imported here so one-shot prompts don't pay for loading prompt_toolkit.
+        from eigengen import chat
+        egg_chat = chat.EggChat(config, user_files)
         egg_chat.chat_mode(initial_prompt=config.args.prompt)
         return
 
@@ -76,7 +73,7 @@ def handle_modes(config: EggConfig) -> None:
     log.log_prompt(prompt)
 
     # Execute the default mode operation
-    operations.default_mode(config.model, list(user_files or []), prompt)
+    operations.default_mode(config.model, user_files, prompt)
 
 def prepare_prompt(config: EggConfig) -> Optional[str]:
     """
@@ -116,6 +113,9 @@ def main() -> None:
     # Store the remaining arguments
     config.args = args
 
+    # Throttle requests to the providers that have a limit configured
+    providers.set_rate_limits(config.requests_per_minute)
+
     # Handle the operational mode based on updated config
     handle_modes(config)
 
@@ -13,6 +13,8 @@ class ChatKeyBindingsManager:
         self.kb = KeyBindings()
         self.quoting_state = quoting_state
         self.messages = messages
+        # number of messages at the start of the conversation carrying the attached files
+        self.context_message_count = 0
         self.pasting = False
         self.last_keypress_time = 0.0
         self.buffer = ""
@@ -23,6 +25,14 @@ class ChatKeyBindingsManager:
         # Return the KeyBindings instance
         return self.kb
 
+    def _last_assistant_message(self) -> str:
+        # scan backwards by index, the latest assistant message is normally the last or second to last one
+        # the acknowledgement of the attached files is not an answer
+        for idx in range(len(self.messages) - 1, self.context_message_count - 1, -1):
+            if self.messages[idx]["role"] == "assistant":
+                return self.messages[idx]["content"]
+        return ""
+
     def _register_bindings(self):
         # Register custom key bindings for the chat application
 
@@ -63,16 +73,16 @@ class ChatKeyBindingsManager:
             quoting each line with '> '.
             """
             # Get the last assistant response to process
-            last_assistant_message = next(
-                (msg["content"] for msg in reversed(self.messages) if msg["role"] == "assistant"),
-                ""
-            )
+            last_assistant_message = self._last_assistant_message()
 
             if self.quoting_state["code_blocks"] is None:
                 # Extract code blocks from the assistant's message for the first time
                 code_blocks = utils.extract_code_blocks(last_assistant_message)
-                # Since extract_code_blocks returns tuples, extract the code content from each tuple
-                self.quoting_state["code_blocks"] = [code for _, _, _, code, _, _ in code_blocks]
+                # Since extract_code_blocks returns tuples, extract the code content from each tuple.
+                # The blocks are quoted once here so cycling through them does not redo the work.
+                self.quoting_state["code_blocks"] = [
+                    utils.quote_text(code) for _, _, _, code, _, _ in code_blocks
+                ]
                 # Create a cycle iterator to cycle through the code blocks
                 self.quoting_state["cycle_iterator"] = (
                     cycle(self.quoting_state["code_blocks"]) if self.quoting_state["code_blocks"] else None
@@ -80,13 +90,12 @@ class ChatKeyBindingsManager:
 
             if self.quoting_state["cycle_iterator"]:
                 # There are code blocks; cycle through them
-                block_to_quote = next(self.quoting_state["cycle_iterator"])
+                quoted_block = next(self.quoting_state["cycle_iterator"])
             else:
                 # No code blocks found; quote the entire message
-                block_to_quote = last_assistant_message
+                # Prepend '> ' to each line in the block to format it as a quote
+                quoted_block = utils.quote_text(last_assistant_message)
 
-            # Prepend '> ' to each line in the block to format it as a quote
-            quoted_block = "\n".join(f"> {line}" for line in block_to_quote.splitlines())
             event.app.current_buffer.text = quoted_block
 
         @self.kb.add("c-j")
@@ -136,11 +145,8 @@ class ChatKeyBindingsManager:
 
             Copies the conversation history to the system clipboard, excluding any file content messages.
             """
-            # Filter out messages that contain file content
-            copy_messages = [
-                msg for msg in self.messages
-                if not (msg["role"] == "user" and msg["content"].startswith("<eigengen_file"))
-            ]
+            # Leave out the attached files and their acknowledgement
+            copy_messages = self.messages[self.context_message_count:]
             # Format the conversation with timestamps
             conversation = "\n\n".join([
                 f"[{'User' if msg['role'] == 'user' else 'Assistant'}] [{datetime.now().strftime('%I:%M:%S %p')}]\n{msg['content']}"
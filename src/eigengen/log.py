@@ -1,7 +1,8 @@
 from typing import List, Dict
 from datetime import datetime
+import itertools
 import os
-import json
+import orjson
 import sys
 
 def log_request_response(model: str, messages: List[Dict[str, str]], final_answer: str) -> None:
@@ -36,8 +37,8 @@ def log_request_response(model: str, messages: List[Dict[str, str]], final_answe
 
     try:
         # Append the log entry to the log file in JSON lines format
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        with open(log_file, "ab") as f:
+            f.write(orjson.dumps(log_entry) + b"\n")
     except Exception as e:
         # Print a warning message to stderr if logging fails
         print(f"Warning: Failed to log request/response: {str(e)}", file=sys.stderr)
@@ -64,8 +65,8 @@ def log_prompt(prompt: str) -> None:
 
     try:
         # Append the log entry to the prompt history file in JSON lines format
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        with open(log_file, "ab") as f:
+            f.write(orjson.dumps(log_entry) + b"\n")
     except Exception as e:
         # Print a warning message to stderr if logging fails
         print(f"Warning: Failed to log prompt: {str(e)}", file=sys.stderr)
@@ -79,19 +80,18 @@ def list_prompt_history(n: int) -> None:
     """
     # Define the prompt history file path
     log_file = os.path.expanduser("~/.eigengen/prompt_history.jsonl")
-    # Check if the prompt history file exists
-    if not os.path.exists(log_file):
+    # Read all lines from the prompt history file, if there is one
+    try:
+        with open(log_file, "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
         print("No prompt history found.")
         return
 
-    # Read all lines from the prompt history file
-    with open(log_file, "r") as f:
-        lines = f.readlines()
-
-    # Parse the JSON lines and reverse the order to get the most recent prompts first
-    prompts = [json.loads(line) for line in reversed(lines)]
+    # Parse only the most recent 'n' JSON lines, most recent first
+    prompts = [orjson.loads(line) for line in itertools.islice(reversed(lines), max(n, 0))]
     # Iterate over the most recent 'n' prompts and display them
-    for i, entry in enumerate(prompts[:n], 1):
+    for i, entry in enumerate(prompts, 1):
         # Format the timestamp for readability
         timestamp = datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
         # Print the prompt with its timestamp and index
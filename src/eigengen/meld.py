@@ -1,93 +1,152 @@
 import difflib
 import subprocess
 import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from eigengen import utils, operations, providers, prompts
 from eigengen.progress import ProgressIndicator  # Added import
 
+# upper bound for meld requests running against the provider at the same time
+MAX_CONCURRENT_MELDS = 4
 
-def meld_changes(model: providers.Model, filepath: str, response: str) -> None:
-    """
-    Melds the changes proposed by the LLM into the specified file.
-
-    Args:
-        filepath: The path to the file to meld changes into.
-        response: The LLM response containing suggested changes within code blocks.
-    """
+# matches <think></think> tags and the intervening text
+_THINK_TAG_RE = re.compile(r"<think>.*?</think>", re.DOTALL)
 
-    code_blocks = utils.extract_code_blocks(response)
-    target_block = None
-    original_content = ""
+# assistant acknowledgement shared by all meld conversations, must not be mutated
+_ACK_MESSAGE = {"role": "assistant", "content": "ok"}
 
-    for _, block_lang, block_path, block_content, _, _ in code_blocks:
-        if not block_path:
-            continue  # Skip blocks without path information
+_MELD_INSTRUCTION = (
+    "You must integrate the relevant changes present in the changes file into the original {filepath}.\n"
+    "You must respond with only the full file contents.\n"
+    "You must not write anything else."
+)
 
-        if block_path == filepath:
-            target_block = block_content
-            break
 
-    if not target_block:
-        print(f"No code block found for file: {filepath}")
-        return
+def meld_files(model: providers.Model, filepaths: List[str], response: str,
+               code_blocks: Optional[List[Tuple[str, str, str, str, int, int]]] = None) -> None:
+    """
+    Melds the changes proposed by the LLM into each of the specified files.
 
-    try:
-        with open(filepath, "r") as f:
-            original_content = f.read()
-    except FileNotFoundError:
-        # this is perfectly ok, we're expected to create the file
-        pass
+    The meld requests for all files are sent to the LLM concurrently, after which
+    the resulting diffs are presented for approval one file at a time.
 
-    apply_meld(model, filepath, original_content, response)
+    Args:
+        filepaths: The paths to the files to meld changes into.
+        response: The LLM response containing suggested changes within code blocks.
+        code_blocks: The code blocks of the response, if the caller has already extracted them.
+    """
+    if code_blocks is None:
+        code_blocks = utils.extract_code_blocks(response)
+    block_paths = {block_path for _, _, block_path, block_content, _, _ in code_blocks
+                   if block_path and block_content}
+
+    meld_paths: List[str] = []
+    for filepath in filepaths:
+        if filepath not in block_paths:
+            print(f"No code block found for file: {filepath}")
+            continue
+        meld_paths.append(filepath)
+
+    # read the originals concurrently, a missing file is perfectly ok as we're expected to create it.
+    # the file content cache is bypassed, the diff must apply to what is on disk right now
+    existing_contents = dict(utils.read_existing_files(meld_paths, cached=False))
+    original_contents: Dict[str, str] = {
+        filepath: existing_contents.get(filepath, "") for filepath in meld_paths
+    }
+
+    if not original_contents:
+        return
 
+    # Initialize and start the progress indicator
+    with ProgressIndicator() as _:
+        if len(original_contents) == 1:
+            # a single request runs on this thread so that Ctrl+C interrupts it right away
+            diffs = {filepath: _request_meld_diff(model, filepath, original_content, response)
+                     for filepath, original_content in original_contents.items()}
+        else:
+            max_workers = min(MAX_CONCURRENT_MELDS, len(original_contents))
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                futures = {
+                    filepath: executor.submit(_request_meld_diff, model, filepath, original_content, response)
+                    for filepath, original_content in original_contents.items()
+                }
+                diffs = {filepath: future.result() for filepath, future in futures.items()}
+            except KeyboardInterrupt:
+                # don't wait for the requests already running, their results are not needed
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+            executor.shutdown()
+
+    for filepath in original_contents:
+        review_meld(filepath, diffs[filepath])
+
+
+def _request_meld_diff(model: providers.Model, filepath: str,
+                       original_content: str, change_content: str) -> Optional[str]:
+    result = request_meld(model, filepath, original_content, change_content)
+    return build_meld_diff(filepath, original_content, result)
+
+
+def request_meld(model: providers.Model, filepath: str, original_content: str, change_content: str) -> str:
+    """
+    Asks the LLM to integrate the changes into the original file content.
 
-def apply_meld(model: providers.Model, filepath: str, original_content: str, change_content: str) -> None:
+    Returns:
+        str: The raw LLM response, or an empty string if the request failed.
+    """
     # remove <think></think> tags and the intervening text from the change_content
-    change_content = re.sub(r"<think>.*?</think>", "", change_content, flags=re.DOTALL)
+    change_content = _THINK_TAG_RE.sub("", change_content)
+    # the encoded original is used both as context and as the predicted output
+    encoded_original = utils.encode_code_block(original_content, filepath)
     # Prepare the conversation messages to send to the LLM
     messages = [
         # Send the original file content to the LLM
-        {"role": "user", "content": utils.encode_code_block(original_content, filepath)},
+        {"role": "user", "content": encoded_original},
         # Assistant acknowledges receipt
-        {"role": "assistant", "content": "ok"},
+        _ACK_MESSAGE,
         # Send the change content to the LLM
         {"role": "user", "content": utils.encode_code_block(change_content, "changes")},
         # Assistant acknowledges receipt
-        {"role": "assistant", "content": "ok"},
+        _ACK_MESSAGE,
         # Instruct the LLM to integrate changes into the original file
-        {"role": "user", "content":
-            f"You must integrate the relevant changes present in the changes file into the original {filepath}.\n"
-            "You must respond with only the full file contents.\n"
-            "You must not write anything else."
-        }
+        {"role": "user", "content": _MELD_INSTRUCTION.format(filepath=filepath)}
     ]
 
-    result = ""
-    # Initialize and start the progress indicator
-    with ProgressIndicator() as _:
-        # Process the request using the LLM and get the updated file content
+    result_chunks: List[str] = []
+    # Process the request using the LLM and get the updated file content
+    try:
+        chunk_iterator = operations.process_request(model,
+                                                    messages,
+                                                    prompts.get_prompt("meld"),
+                                                    encoded_original)
+        for chunk in chunk_iterator:
+            result_chunks.append(chunk)
+    except Exception as e:
+        print(f"An error occurred during LLM processing: {e}")
+
+    return "".join(result_chunks)
 
-        try:
-            chunk_iterator = operations.process_request(model,
-                                                        messages,
-                                                        prompts.get_prompt("meld"),
-                                                        utils.encode_code_block(original_content, filepath))
-            for chunk in chunk_iterator:
-                result += chunk
-        except Exception as e:
-            print(f"An error occurred during LLM processing: {e}")
 
+def build_meld_diff(filepath: str, original_content: str, result: str) -> Optional[str]:
+    """
+    Builds a unified diff between the original file content and the meld response.
+
+    Returns:
+        Optional[str]: The diff, or None if the LLM returned no response.
+    """
     if not result:
-        print("No response received from the LLM.")
-        return
+        return None
     # remove <think></think> tags and the intervening text
-    result = re.sub(r"<think>.*?</think>", "", result, flags=re.DOTALL)
+    result = _THINK_TAG_RE.sub("", result)
     # remove whitespace at the beginning and end of the response block
     result = result.strip()
-    processed_file_lines = "".join(result).splitlines()
-    if processed_file_lines[0].startswith("```"):
+    if result.startswith("```"):
         # we expect this, but some models may fail to wrap the output with fences
-        processed_file_lines = processed_file_lines[1:-1]
+        # drop the opening and closing fence lines
+        result = result.partition("\n")[2].rpartition("\n")[0]
+    processed_file_lines = result.splitlines()
 
     # Generate a unified diff between the original content and the updated content
     diff_output = "\n".join(
@@ -100,6 +159,17 @@ def apply_meld(model: providers.Model, filepath: str, original_content: str, cha
         )
     ) + "\n"  # add final newline
 
+    return diff_output
+
+
+def review_meld(filepath: str, diff_output: Optional[str]) -> None:
+    """
+    Shows the diff produced by a meld request and applies it if the user accepts it.
+    """
+    if diff_output is None:
+        print("No response received from the LLM.")
+        return
+
     # Pipe the diff output via pager
     utils.pipe_output_via_pager(diff_output)
 
@@ -110,7 +180,7 @@ def apply_meld(model: providers.Model, filepath: str, original_content: str, cha
         try:
             # Run the patch command with the diff output
             patch_process = subprocess.Popen(["patch", "-u", "-p1", filepath], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            patch_stdout, patch_stderr = patch_process.communicate(input=diff_output.encode())
+            patch_stdout, patch_stderr = patch_process.communicate(input=diff_output.encode('utf-8'))
             if patch_process.returncode == 0:
                 print("Changes applied successfully.")
             else:
@@ -1,5 +1,6 @@
 from typing import Dict, List, Optional, Generator
 import os
+import sys
 import contextlib
 
 from eigengen import log, providers, utils
@@ -42,10 +43,11 @@ def process_request(model: providers.Model, messages: List[Dict[str, str]], syst
 
     combined_messages = steering_messages + messages
 
-    final_answer: str = ""
+    answer_chunks: List[str] = []
     for chunk in model.provider.make_request(model.model_name, combined_messages, model.max_tokens, model.temperature):
-        final_answer += chunk
+        answer_chunks.append(chunk)
         yield chunk
+    final_answer = "".join(answer_chunks)
 
     # Log the request and response
     log.log_request_response(model.model_name, messages, final_answer)
@@ -60,24 +62,26 @@ def default_mode(model: str, user_files: Optional[List[str]], prompt: str) -> No
         prompt (str): The user's prompt.
     """
     messages: List[Dict[str, str]] = []
-    msg_content = prompt
+    msg_parts = [prompt]
 
     if user_files:
         project_root = os.getcwd()
         with open_fd(project_root, os.O_RDONLY) as dir_fd:
-            for fname in user_files:
-                with os.fdopen(os.open(fname, os.O_RDONLY, dir_fd=dir_fd), 'r') as f:
-                    original_content = f.read()
-                # Add the content of the file to the messages
-                msg_content += "\n" + utils.encode_code_block(original_content, fname)
+            file_contents = utils.read_files(user_files, dir_fd)
+        for fname, content in zip(user_files, file_contents):
+            # Add the content of the file to the messages
+            msg_parts.append(utils.encode_code_block(content, fname))
     # Add the user's prompt to the messages
-    messages.append({"role": "user", "content": msg_content})
+    messages.append({"role": "user", "content": "\n".join(msg_parts)})
 
     model_pair = providers.create_model_pair(model)
     # Process the request and print the response
+    write = sys.stdout.write
     for chunk in process_request(model_pair.large, messages, PROMPTS["general"]):
-        print(chunk, end="", flush=True)
-    print("")
+        write(chunk)
+        sys.stdout.flush()
+    write("\n")
+    sys.stdout.flush()
 
 
 def get_file_list(user_files: Optional[List[str]] = None) -> List[str]:
@@ -1,11 +1,18 @@
+import sys
 import threading
 import time
 from typing import Optional, Generator
 
 from prompt_toolkit.shortcuts import print_formatted_text
 from prompt_toolkit.formatted_text import FormattedText
+from prompt_toolkit.output import create_output
 from prompt_toolkit.styles import Style
 
+# style of the progress word, shared by all indicators
+PROGRESS_STYLE = Style.from_dict({
+    "progress": "ansicyan"  # You can customize the color as desired
+})
+
 
 class ProgressIndicator:
     """
@@ -24,10 +31,7 @@ class ProgressIndicator:
         # Configuration for animation
         self.animation_frames = self._generate_animation_frames()
 
-        # Define the style for the progress word
-        self.style = Style.from_dict({
-            "progress": "ansicyan"  # You can customize the color as desired
-        })
+        self.style = PROGRESS_STYLE
 
     def _generate_animation_frames(self) -> Generator[FormattedText, None, None]:
         """
@@ -63,10 +67,14 @@ class ProgressIndicator:
     def _animate(self):
         try:
             print("\033[?25l", end='')  # Hide the cursor
+            # create the terminal output once instead of for every frame,
+            # and only flush once per frame after the frame has been written
+            output = create_output()
+            write = sys.stdout.write
             while self._running:
                 frame = next(self.animation_frames)
-                print("\r", end='', flush=False)
-                print_formatted_text(frame, end='', style=self.style, flush=True)
+                write("\r")
+                print_formatted_text(frame, end='', style=self.style, output=output, flush=True)
                 time.sleep(self.interval)
         finally:
             # Clear the line after stopping
@@ -74,7 +82,8 @@ class ProgressIndicator:
             print("\033[?25h", end='')  # Show the cursor
 
     def start(self):
-        if not self._running:
+        # the animation is only meant for a terminal, don't write it into redirected output
+        if not self._running and sys.stdout.isatty():
             self._running = True
             self._thread = threading.Thread(target=self._animate, daemon=True)
             self._thread.start()
@@ -1,11 +1,14 @@
+import functools
 import os
 
+@functools.lru_cache(maxsize=None)
 def get_prompt(role: str) -> str:
     # we look for prompts from:
     #  ~/.eigengen/{role}.txt
     # if the file is not found, we use the default prompt
+    # the result is resolved once per role and reused for the rest of the process
     try:
-        with open(os.path.expanduser(f"~/.eigengen/{role}.txt")) as f:
+        with open(os.path.expanduser(f"~/.eigengen/{role}.txt"), encoding='utf-8') as f:
             return(f.read())
     except FileNotFoundError:
         return PROMPTS[role]
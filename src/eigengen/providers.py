@@ -1,23 +1,55 @@
 from abc import ABC, abstractmethod
 import dataclasses
+import functools
+import logging
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 import time
 import random
 import os
-from typing import Any, Dict, Iterable, List, Generator, Optional, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Generator, Optional, Tuple, Type, cast
 
-import anthropic
-import groq
-import openai
-from google import genai
-from google.genai import types
-from mistralai import Mistral
+from eigengen.ratelimit import TokenBucket
+
+# The provider SDKs are imported where they are used, so that only the SDK of the
+# selected provider is loaded at runtime.
+if TYPE_CHECKING:
+    import anthropic
+    import groq
+    import openai
+    from google import genai
+    from mistralai import Mistral
+
+logger = logging.getLogger(__name__)
 
 OLLAMA_BASE_URL: str = "http://localhost:11434"
+# (connect, read) timeouts in seconds; the read timeout allows for slow model loading
+OLLAMA_TIMEOUT = (3.05, 600)
+
+_ollama_session: Optional[requests.Session] = None
+
+
+def get_ollama_session() -> requests.Session:
+    """
+    Returns the shared Ollama HTTP session, creating it on first use.
+
+    Reusing one session keeps the keep-alive connection to the Ollama server
+    open between requests instead of reconnecting on every call.
+    """
+    global _ollama_session
+    if _ollama_session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _ollama_session = session
+    return _ollama_session
 
 
 class ModelConfig:
+    __slots__ = ("provider", "model", "mini_model", "max_tokens", "temperature")
+
     def __init__(self, provider: str, model: str, mini_model: str, max_tokens: int, temperature: float):
         self.provider = provider
         self.model = model
@@ -36,7 +68,105 @@ MODEL_CONFIGS: Dict[str, ModelConfig] = {
     "mistral": ModelConfig("mistral", "mistral-large-latest", "mistral-large-latest", 32768, 0.7)
 }
 
+def backoff_delay(attempt: int, base_delay: float = 1, cap: float = 60) -> float:
+    """
+    Returns the retry delay for the given attempt using exponential backoff with full jitter.
+
+    The delay is drawn uniformly between zero and the exponential backoff value, capped at `cap` seconds.
+    """
+    return random.uniform(0, min(cap, base_delay * (1 << attempt)))
+
+
+def retry_on_rate_limit(error_types: Callable[[], Tuple[Type[BaseException], ...]],
+                        max_retries: int = 5,
+                        base_delay: float = 1,
+                        message: str = "Rate limit hit."):
+    """
+    Retries a streaming make_request with exponential backoff when it raises one of the given errors.
+
+    `error_types` is called on the first failure to resolve the exception classes, so that the
+    provider SDK does not need to be imported when this module is loaded. A request is only
+    retried if it failed before producing any output; errors in the middle of a stream are
+    raised as is, since retrying would repeat the already yielded text. Every attempt, including
+    the retries, takes a token from the rate limiter of the provider if it has one.
+    """
+    def decorator(make_request: Callable[..., Generator[str, None, None]]):
+        @functools.wraps(make_request)
+        def wrapper(self: "Provider", *args, **kwargs) -> Generator[str, None, None]:
+            for attempt in range(max_retries):
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire()
+                produced_output = False
+                try:
+                    for chunk in make_request(self, *args, **kwargs):
+                        produced_output = True
+                        yield chunk
+                    return
+                except Exception as e:
+                    if (produced_output or attempt == max_retries - 1
+                            or not isinstance(e, error_types())):
+                        raise
+                    delay = backoff_delay(attempt, base_delay)
+                    logger.warning("%s Retrying in %.2f seconds...", message, delay)
+                    time.sleep(delay)
+            raise IOError(f"Unable to complete API call in {max_retries} retries")
+        return wrapper
+    return decorator
+
+
+def _anthropic_rate_limit_errors() -> Tuple[Type[BaseException], ...]:
+    import anthropic
+    return (anthropic.RateLimitError,)
+
+
+def _groq_rate_limit_errors() -> Tuple[Type[BaseException], ...]:
+    import groq
+    return (groq.RateLimitError,)
+
+
+def _openai_rate_limit_errors() -> Tuple[Type[BaseException], ...]:
+    import openai
+    return (openai.RateLimitError,)
+
+
+def _any_error() -> Tuple[Type[BaseException], ...]:
+    return (Exception,)
+
+
+# client-side request limits per provider name, providers without a limit are not throttled
+_requests_per_minute: Dict[str, int] = {}
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+
+
+def set_rate_limits(requests_per_minute: Dict[str, int]) -> None:
+    """
+    Sets the client-side requests per minute limits of the providers, replacing any previous limits.
+
+    Providers that are missing from the mapping, or have a limit of zero or less, are not throttled.
+    """
+    _requests_per_minute.clear()
+    _requests_per_minute.update({name: limit for name, limit in requests_per_minute.items() if limit > 0})
+    _rate_limiters.clear()
+    for name, provider in _providers.items():
+        provider.rate_limiter = get_rate_limiter(name)
+
+
+def get_rate_limiter(provider: str) -> Optional[TokenBucket]:
+    """
+    Returns the rate limiter shared by all models of the provider, or None if the provider is not limited.
+    """
+    if provider not in _requests_per_minute:
+        return None
+    if provider not in _rate_limiters:
+        _rate_limiters[provider] = TokenBucket.from_requests_per_minute(_requests_per_minute[provider])
+    return _rate_limiters[provider]
+
+
 class Provider(ABC):
+    # throttles every request attempt before it is sent, retries included, set by get_provider
+    rate_limiter: Optional[TokenBucket] = None
+
     @abstractmethod
     def make_request(self,
                      model: str,
@@ -47,7 +177,7 @@ class Provider(ABC):
         pass
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Model:
     provider: Provider
     model_name: str
@@ -55,7 +185,7 @@ class Model:
     max_tokens: int
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ModelPair:
     large: Model
     small: Model
@@ -64,6 +194,7 @@ class ModelPair:
 class OllamaProvider(Provider):
     def __init__(self):
         super().__init__()
+        self._session = get_ollama_session()
 
     def make_request(self,
                      model: str,
@@ -71,7 +202,9 @@ class OllamaProvider(Provider):
                      max_tokens: int,
                      temperature: float,
                      _=None) -> Generator[str, None, None]:
-        headers: Dict[str, str] = {'Content-Type': 'application/json'}
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
         data: Dict[str, Any] = {
             "model": model,
             "messages": messages,
@@ -81,232 +214,181 @@ class OllamaProvider(Provider):
                 "max_tokens": max_tokens
             }
         }
-        response = requests.post(f"{OLLAMA_BASE_URL}/api/chat", headers=headers, data=json.dumps(data), stream=True)
+        response = self._session.post(f"{OLLAMA_BASE_URL}/api/chat",
+                                      data=orjson.dumps(data),
+                                      headers={"Content-Type": "application/json"},
+                                      stream=True,
+                                      timeout=OLLAMA_TIMEOUT)
         response.raise_for_status()
 
         for line in response.iter_lines():
             if line:
-                content = json.loads(line)["message"]["content"]
+                content = orjson.loads(line)["message"]["content"]
                 yield content
 
 class AnthropicProvider(Provider):
-    def __init__(self, client: anthropic.Anthropic):
+    def __init__(self, client: "anthropic.Anthropic"):
         super().__init__()
-        self.client: anthropic.Anthropic = client
+        self.client: "anthropic.Anthropic" = client
 
+    @retry_on_rate_limit(_anthropic_rate_limit_errors)
     def make_request(self,
                      model: str,
                      messages: List[Dict[str, str]],
                      max_tokens: int,
                      temperature: float,
                      _=None) -> Generator[str, None, None]:
+        import anthropic
 
         if len(messages) < 1:
             return
 
         system_message = messages[0]["content"]
         messages = messages[1:]
-        max_retries = 5
-        base_delay = 1
-
-        for attempt in range(max_retries):
-            try:
-                with self.client.messages.stream(
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    messages=cast(Iterable[anthropic.types.MessageParam], messages),
-                    system=system_message
-                ) as stream:
-                    for text in stream.text_stream:
-                        yield text
-                return
-            except anthropic.RateLimitError as e:
-                if attempt == max_retries - 1:
-                    raise e
-                delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise IOError(f"Unable to complete API call in {max_retries} retries")
+
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=cast(Iterable[anthropic.types.MessageParam], messages),
+            system=system_message
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
 
 class GroqProvider(Provider):
-    def __init__(self, client: groq.Groq):
+    def __init__(self, client: "groq.Groq"):
         super().__init__()
-        self.client: groq.Groq = client
-        self.max_retries = 5
-        self.base_delay = 1
+        self.client: "groq.Groq" = client
 
+    @retry_on_rate_limit(_groq_rate_limit_errors)
     def make_request(self, model: str, messages: List[Dict[str, str]],
                      max_tokens: int, temperature: float, _=None) -> Generator[str, None, None]:
-
-        for attempt in range(self.max_retries):
-            try:
-                response = self.client.chat.completions.create(
-                    messages=cast(List, messages),
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    stream=True
-                )
-
-                for chunk in response:
-                    content = chunk.choices[0].delta.content
-                    if content is not None:
-                        yield content
-                return
-            except groq.RateLimitError as e:
-                if attempt == self.max_retries - 1:
-                    raise e
-                delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise IOError(f"Unable to complete API call in {self.max_retries} retries")
+        response = self.client.chat.completions.create(
+            messages=cast(List, messages),
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True
+        )
+
+        for chunk in response:
+            content = chunk.choices[0].delta.content
+            if content is not None:
+                yield content
 
 
 class OpenAIProvider(Provider):
-    def __init__(self, client: openai.OpenAI):
+    def __init__(self, client: "openai.OpenAI"):
         super().__init__()
-        self.client: openai.OpenAI = client
-        self.max_retries = 5
-        self.base_delay = 1
+        self.client: "openai.OpenAI" = client
 
+    @retry_on_rate_limit(_openai_rate_limit_errors)
     def make_request(self, model: str, messages: List[Dict[str, str]],
-                     max_tokens: int, temperature: float, max_retries: int = 5,
-                     base_delay: int = 1, prediction: Optional[str] = None) -> Generator[str, None, None]:
-
-        # map to openai specifics
-        openai_messages: List[openai.types.chat.ChatCompletionMessageParam] = []
-
-        for message in messages:
-            role = message["role"]
-            if role == "system" and model in ["o1-preview", "o1-mini"]:
-                # need to pass the system message as a user message for these models
-                openai_messages.extend([
-                    { "role": "user", "content": message["content"] },
-                    { "role": "assistant", "content": "Acknowledge." }
-                ])
-            else:
-                openai_messages.append({ "role": role, "content": message["content"] })
-
-        for attempt in range(max_retries):
-            try:
-                params = { }
-
-                use_stream = True if model not in ["o1", "o1-mini"] else False
-
-                if model not in ["o1", "o3-mini"]:
-                    params["temperature"] = temperature
-                    if prediction:
-                        params["prediction"] = prediction
-
-                response = self.client.chat.completions.create(
-                    model=model,
-                    messages=cast(List, openai_messages),
-                    stream=use_stream,
-                    **params
-                )
-                if isinstance(response, openai.Stream):
-                    for chunk in response:
-                        part = chunk.choices[0].delta.content
-                        if part is not None:
-                            yield part
+                     max_tokens: int, temperature: float,
+                     prediction: Optional[str] = None) -> Generator[str, None, None]:
+        import openai
+
+        # the messages are already in the format the API expects, they only
+        # need to be rewritten for models that do not accept a system message
+        openai_messages = messages
+        if model in ["o1-preview", "o1-mini"]:
+            openai_messages = []
+            for message in messages:
+                if message["role"] == "system":
+                    # need to pass the system message as a user message for these models
+                    openai_messages.extend([
+                        { "role": "user", "content": message["content"] },
+                        { "role": "assistant", "content": "Acknowledge." }
+                    ])
                 else:
-                    content = response.choices[0].message.content
-                    yield content or ""
-                return
-            except openai.RateLimitError as e:
-                if attempt == self.max_retries - 1:
-                    raise e
-                delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise IOError(f"Unable to complete API call in {self.max_retries} retries")
+                    openai_messages.append(message)
+
+        params = { }
+
+        use_stream = True if model not in ["o1", "o1-mini"] else False
+
+        if model not in ["o1", "o3-mini"]:
+            params["temperature"] = temperature
+            if prediction:
+                params["prediction"] = prediction
+
+        response = self.client.chat.completions.create(
+            model=model,
+            messages=cast(List, openai_messages),
+            stream=use_stream,
+            **params
+        )
+        if isinstance(response, openai.Stream):
+            for chunk in response:
+                part = chunk.choices[0].delta.content
+                if part is not None:
+                    yield part
+        else:
+            content = response.choices[0].message.content
+            yield content or ""
 
 
 class GoogleProvider(Provider):
-    def __init__(self, client: genai.Client):
+    def __init__(self, client: "genai.Client"):
         super().__init__()
         self.client = client
-        self.max_retries = 5
-        self.base_delay = 1
 
+    @retry_on_rate_limit(_any_error, message="Error occurred.")
     def make_request(self, model: str, messages: List[Dict[str, str]],
                      max_tokens: int, temperature: float, _=None) -> Generator[str, None, None]:
+        from google.genai import types
+
         if len(messages) < 1:
             return
 
         system_message = messages[0]["content"]
 
-        for attempt in range(self.max_retries):
-            try:
-                chat = self.client.chats.create(
-                    model=model,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_message,
-                        candidate_count=1,
-                        max_output_tokens=max_tokens,
-                        temperature=temperature,
-                    ),
-                    history=cast(
-                        List[types.Content],
-                        [
-                            {"role": "user", "parts": [{"text": message["content"]}]}
-                            if message["role"] == "user"
-                            else {"role": "model", "parts": [{"text": message["content"]}]}
-                            for message in messages[1:-1]
-                        ],
-                    ),
-                )
-                response = chat.send_message(
-                    messages[-1]["content"],
-                )
-                if response.candidates:
-                    yield response.candidates[0].content.parts[0].text or ""
-                else:
-                    yield ""
-                return
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise e
-                delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Error occurred. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise IOError(f"Unable to complete API call in {self.max_retries} retries")
+        chat = self.client.chats.create(
+            model=model,
+            config=types.GenerateContentConfig(
+                system_instruction=system_message,
+                candidate_count=1,
+                max_output_tokens=max_tokens,
+                temperature=temperature,
+            ),
+            history=cast(
+                List[types.Content],
+                [
+                    {"role": "user", "parts": [{"text": message["content"]}]}
+                    if message["role"] == "user"
+                    else {"role": "model", "parts": [{"text": message["content"]}]}
+                    for message in messages[1:-1]
+                ],
+            ),
+        )
+        for chunk in chat.send_message_stream(messages[-1]["content"]):
+            if chunk.candidates and chunk.candidates[0].content and chunk.candidates[0].content.parts:
+                yield chunk.candidates[0].content.parts[0].text or ""
 
 
 
 class MistralProvider(Provider):
-    def __init__(self, client: Mistral):
+    def __init__(self, client: "Mistral"):
         super().__init__()
-        self.client: Mistral = client
-        self.max_retries = 5
-        self.base_delay = 1
+        self.client: "Mistral" = client
 
+    @retry_on_rate_limit(_any_error, message="Error occurred.")
     def make_request(self, model: str, messages: List[Dict[str, str]],
                      max_tokens: int, temperature: float, _=None) -> Generator[str, None, None]:
-        for attempt in range(self.max_retries):
-            try:
-                response = self.client.chat.stream(
-                    model=model,
-                    messages=cast(List, messages),
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                if response is None:
-                    return
+        response = self.client.chat.stream(
+            model=model,
+            messages=cast(List, messages),
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
+        if response is None:
+            return
 
-                for event in response:
-                    content = event.data.choices[0].delta.content
-                    if content:
-                        yield content
-                return
-            except Exception as e:
-                if attempt == self.max_retries - 1:
-                    raise e
-                delay = self.base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Error occurred. Retrying in {delay:.2f} seconds...")
-                time.sleep(delay)
-        raise IOError(f"Unable to complete API call in {self.max_retries} retries")
+        for event in response:
+            content = event.data.choices[0].delta.content
+            if content:
+                yield content
 
 
 def get_api_key(provider: str) -> str:
@@ -317,40 +399,76 @@ def get_api_key(provider: str) -> str:
     return api_key
 
 
+def _create_ollama_provider() -> Provider:
+    return OllamaProvider()
+
+
+def _create_anthropic_provider() -> Provider:
+    import anthropic
+    return AnthropicProvider(anthropic.Anthropic(api_key=get_api_key("anthropic")))
+
+
+def _create_groq_provider() -> Provider:
+    import groq
+    return GroqProvider(groq.Groq(api_key=get_api_key("groq")))
+
+
+def _create_openai_provider() -> Provider:
+    import openai
+    return OpenAIProvider(openai.OpenAI(api_key=get_api_key("openai")))
+
+
+def _create_google_provider() -> Provider:
+    from google import genai
+    return GoogleProvider(genai.Client(api_key=get_api_key("google")))
+
+
+def _create_mistral_provider() -> Provider:
+    from mistralai import Mistral
+    return MistralProvider(Mistral(api_key=get_api_key("mistral")))
+
+
+def _create_deepseek_provider() -> Provider:
+    import openai
+    return OpenAIProvider(openai.OpenAI(api_key=get_api_key("deepseek"), base_url="https://api.deepseek.com"))
+
+
+_PROVIDER_FACTORIES: Dict[str, Callable[[], Provider]] = {
+    "ollama": _create_ollama_provider,
+    "anthropic": _create_anthropic_provider,
+    "groq": _create_groq_provider,
+    "openai": _create_openai_provider,
+    "google": _create_google_provider,
+    "mistral": _create_mistral_provider,
+    "deepseek": _create_deepseek_provider,
+}
+
+_providers: Dict[str, Provider] = {}
+
+
+def get_provider(name: str) -> Provider:
+    """
+    Returns the provider instance for the given provider name, creating it on first use.
+
+    Providers are shared between model pairs so that switching models keeps the SDK
+    client and its connection pool alive.
+    """
+    if name not in _providers:
+        factory = _PROVIDER_FACTORIES.get(name)
+        if factory is None:
+            raise ValueError(f"Invalid provider specified: {name}")
+        provider = factory()
+        provider.rate_limiter = get_rate_limiter(name)
+        _providers[name] = provider
+    return _providers[name]
+
+
 def create_model_pair(nickname: str) -> ModelPair:
     if nickname not in MODEL_CONFIGS:
         raise ValueError(f"Invalid model nickname: {nickname}")
 
     config = MODEL_CONFIGS[nickname]
-    provider = None
-    if config.provider == "ollama":
-        provider = OllamaProvider()
-    elif config.provider == "anthropic":
-        api_key = get_api_key("anthropic")
-        client = anthropic.Anthropic(api_key=api_key)
-        provider =  AnthropicProvider(client)
-    elif config.provider == "groq":
-        api_key = get_api_key("groq")
-        client = groq.Groq(api_key=api_key)
-        provider = GroqProvider(client)
-    elif config.provider == "openai":
-        api_key = get_api_key("openai")
-        client = openai.OpenAI(api_key=api_key)
-        provider = OpenAIProvider(client)
-    elif config.provider == "google":
-        api_key = get_api_key("google")
-        client = genai.Client(api_key=api_key)
-        provider = GoogleProvider(client)
-    elif config.provider == "mistral":
-        api_key = get_api_key("mistral")
-        client = Mistral(api_key=api_key)
-        provider = MistralProvider(client)
-    elif config.provider == "deepseek":
-        api_key = get_api_key("deepseek")
-        client = openai.OpenAI(api_key=api_key, base_url="https://api.deepseek.com")
-        provider = OpenAIProvider(client)
-    else:
-        raise ValueError(f"Invalid provider specified: {config.provider}")
+    provider = get_provider(config.provider)
     return ModelPair(large=Model(provider=provider,
                                  model_name=config.model,
                                  temperature=config.temperature,
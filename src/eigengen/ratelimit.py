@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` tokens per second up to `capacity`.
+    Each request consumes one token; when the bucket is empty callers wait until
+    enough tokens have been refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_requests_per_minute(cls, requests_per_minute: int) -> 'TokenBucket':
+        """
+        Creates a bucket for a requests-per-minute limit, allowing bursts of up to ten seconds worth of requests.
+        """
+        return cls(requests_per_minute / 60.0, max(1.0, requests_per_minute / 6.0))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """
+        Takes tokens from the bucket if available.
+
+        Returns:
+            bool: True if the tokens were taken, False if the bucket did not have enough tokens.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1) -> None:
+        """
+        Takes tokens from the bucket, waiting until enough tokens are available.
+        """
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
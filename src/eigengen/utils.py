@@ -1,18 +1,190 @@
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Tuple, Optional, Union
+import contextlib
+import functools
+import itertools
+import mmap
 import re
 import tempfile
 import subprocess
+import shutil
 import os
-import io  # Add this import for StringIO
-import pygments.formatters  # Ensure this import is present
-
-import pygments
-from pygments.lexers import get_lexer_by_name, guess_lexer
-from pygments.lexers.special import TextLexer
-from pygments.styles import get_style_by_name
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from eigengen.config import EggConfig  # Add this import
 
+# Pygments is imported where it is used, as importing it takes a noticeable
+# part of the startup time and it is only needed when printing code blocks.
+if TYPE_CHECKING:
+    import pygments.formatters
+    from pygments.lexer import Lexer
+
+# number of characters encoded and written to the pager at a time
+PAGER_WRITE_CHUNK_SIZE = 64 * 1024
+
+# files larger than this are decoded straight from a memory map
+MMAP_THRESHOLD = 64 * 1024
+
+# upper bound for threads reading files concurrently
+MAX_READ_WORKERS = 8
+
+# number of files kept in the in-process file content cache
+FILE_CACHE_SIZE = 256
+
+# Regular expression pattern to match code blocks with variable-length fences and indentation
+_CODE_BLOCK_RE = re.compile(
+    r'^(?P<indent>[ \t]*)'          # Leading indentation (spaces or tabs)
+    r'(?P<fence>`{3,}|~{3,})'       # Opening code fence (at least 3 backticks or tildes)
+    r'[ \t]*(?P<lang_path>\S+)?'    # Optional language identifier and/or file path
+    r'[ \t]*\n'                     # Optional trailing spaces and a newline
+    r'(?P<code>.*?)'                # Code content (non-greedy)
+    r'\n'                           # Newline before the closing fence
+    r'(?P=indent)'                  # Matching leading indentation
+    r'(?P=fence)'                   # Closing code fence matching the opening fence
+    r'[ \t]*\n?',                   # Optional trailing spaces and an optional newline
+    re.DOTALL | re.MULTILINE
+)
+
+# matches runs of backticks
+_BACKTICK_RUN_RE = re.compile(r'`+')
+
+# number of guessed code block lexers remembered
+GUESS_LEXER_CACHE_SIZE = 128
+
+# code blocks shorter than this are not worth guessing a language for
+MIN_GUESS_LEXER_LENGTH = 32
+
+# code block language tags that are rendered without highlighting
+PLAIN_TEXT_LANGUAGES = frozenset(("text", "txt", "plain", "plaintext"))
+
+# hash of the code -> lexer guessed for it
+_guessed_lexers: "OrderedDict[int, Lexer]" = OrderedDict()
+
+# absolute path -> (mtime in ns, size, content)
+_file_cache: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_file_cache_lock = threading.Lock()
+
+def read_file_content(path: str, dir_fd: Optional[int] = None) -> str:
+    """
+    Reads a UTF-8 text file, translating CRLF and CR line endings to LF like text mode open() does.
+
+    Large files are memory-mapped and decoded directly from the mapping, which avoids
+    holding both the raw bytes and the decoded string in memory at the same time.
+
+    Parameters:
+        path (str): The path of the file to read.
+        dir_fd (Optional[int]): Directory file descriptor that relative paths are resolved against.
+
+    Returns:
+        str: The file content.
+    """
+    with os.fdopen(os.open(path, os.O_RDONLY, dir_fd=dir_fd), 'rb') as f:
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                content = str(mapped, 'utf-8')
+        else:
+            content = f.read().decode('utf-8')
+    return _normalize_newlines(content)
+
+def _normalize_newlines(text: str) -> str:
+    if "\r" not in text:
+        return text
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def read_file_cached(path: str) -> str:
+    """
+    Reads a UTF-8 text file, reusing the previously read content if the file has not changed.
+
+    A file is considered unchanged when both its modification time and size match the
+    cached entry, so repeated reads of the same file during a session only cost a stat.
+
+    Parameters:
+        path (str): The path of the file to read.
+
+    Returns:
+        str: The file content.
+    """
+    abs_path = os.path.abspath(path)
+    st = os.stat(abs_path)
+    with _file_cache_lock:
+        entry = _file_cache.get(abs_path)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            _file_cache.move_to_end(abs_path)
+            return entry[2]
+
+    content = read_file_content(abs_path)
+    with _file_cache_lock:
+        _file_cache[abs_path] = (st.st_mtime_ns, st.st_size, content)
+        _file_cache.move_to_end(abs_path)
+        while len(_file_cache) > FILE_CACHE_SIZE:
+            _file_cache.popitem(last=False)
+    return content
+
+def unique_paths(paths: Iterable[str]) -> List[str]:
+    """
+    Removes duplicate paths, keeping the first occurrence of each file in order.
+
+    Paths are compared by their absolute form, so 'a.py' and './a.py' are the same file.
+
+    Parameters:
+        paths (Iterable[str]): The paths to deduplicate.
+
+    Returns:
+        List[str]: The unique paths as given by the caller.
+    """
+    unique = {}
+    for path in paths:
+        unique.setdefault(os.path.abspath(path), path)
+    return list(unique.values())
+
+def read_files(paths: List[str], dir_fd: Optional[int] = None) -> List[str]:
+    """
+    Reads several UTF-8 text files concurrently.
+
+    Parameters:
+        paths (List[str]): The paths of the files to read.
+        dir_fd (Optional[int]): Directory file descriptor that relative paths are resolved against.
+
+    Returns:
+        List[str]: The file contents in the same order as the paths.
+    """
+    if len(paths) <= 1:
+        return [read_file_content(path, dir_fd) for path in paths]
+
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(paths))) as executor:
+        return list(executor.map(lambda path: read_file_content(path, dir_fd), paths))
+
+def _read_file_content_if_exists(path: str, cached: bool) -> Optional[str]:
+    try:
+        return read_file_cached(path) if cached else read_file_content(path)
+    except FileNotFoundError:
+        return None
+
+def read_existing_files(paths: List[str], cached: bool = True) -> List[Tuple[str, str]]:
+    """
+    Reads several UTF-8 text files concurrently, skipping the ones that do not exist.
+
+    By default the files are read through read_file_cached(), so files that are read
+    again later in the session are only read once. Callers that must see the current
+    content on disk, such as /meld reading the files it is about to patch, pass
+    cached=False.
+
+    Parameters:
+        paths (List[str]): The paths of the files to read.
+        cached (bool): Whether to read the files through the file content cache.
+
+    Returns:
+        List[Tuple[str, str]]: (path, content) pairs of the existing files, in the same order as the paths.
+    """
+    if len(paths) <= 1:
+        contents = [_read_file_content_if_exists(path, cached) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(paths))) as executor:
+            contents = list(executor.map(lambda path: _read_file_content_if_exists(path, cached), paths))
+    return [(path, content) for path, content in zip(paths, contents) if content is not None]
+
 def encode_code_block(code_content, file_path=''):
     """
     Encapsulates the code content in a Markdown code block,
@@ -26,8 +198,8 @@ def encode_code_block(code_content, file_path=''):
     Returns:
         str: The code content encapsulated within a Markdown code block.
     """
-    # Find all sequences of backticks in the code content
-    backtick_sequences = re.findall(r'`+', code_content)
+    # Find all sequences of backticks in the code content, skipping the regex when there are none
+    backtick_sequences = _BACKTICK_RUN_RE.findall(code_content) if '`' in code_content else None
     if backtick_sequences:
         # Determine the maximum length of backtick sequences found
         max_backticks = max(len(seq) for seq in backtick_sequences)
@@ -64,22 +236,8 @@ def extract_code_blocks(response: str) -> List[Tuple[str, str, str, str, int, in
     """
     code_blocks = []
 
-    # Regular expression pattern to match code blocks with variable-length fences and indentation
-    code_block_pattern = re.compile(
-        r'^(?P<indent>[ \t]*)'          # Leading indentation (spaces or tabs)
-        r'(?P<fence>`{3,}|~{3,})'       # Opening code fence (at least 3 backticks or tildes)
-        r'[ \t]*(?P<lang_path>\S+)?'    # Optional language identifier and/or file path
-        r'[ \t]*\n'                     # Optional trailing spaces and a newline
-        r'(?P<code>.*?)'                # Code content (non-greedy)
-        r'\n'                           # Newline before the closing fence
-        r'(?P=indent)'                  # Matching leading indentation
-        r'(?P=fence)'                   # Closing code fence matching the opening fence
-        r'[ \t]*\n?',                   # Optional trailing spaces and an optional newline
-        re.DOTALL | re.MULTILINE
-    )
-
     # Find all code blocks in the response string
-    for match in code_block_pattern.finditer(response):
+    for match in _CODE_BLOCK_RE.finditer(response):
         fence = match.group('fence')
         lang_path = match.group('lang_path') or ""
         code = match.group('code')
@@ -100,6 +258,24 @@ def extract_code_blocks(response: str) -> List[Tuple[str, str, str, str, int, in
 
     return code_blocks
 
+def quote_text(text: str) -> str:
+    """
+    Quotes text by prefixing each line with '> '.
+
+    A single trailing newline does not start a new quoted line.
+
+    Parameters:
+        text (str): The text to quote.
+
+    Returns:
+        str: The quoted text.
+    """
+    if not text:
+        return ""
+    if text.endswith("\n"):
+        text = text[:-1]
+    return "> " + text.replace("\n", "\n> ")
+
 def get_prompt_from_editor_with_prefill(config: EggConfig, prefill_content: str) -> Optional[str]:
     """
     Opens a temporary file with prefilled content in the user's default editor and returns the edited content.
@@ -112,7 +288,7 @@ def get_prompt_from_editor_with_prefill(config: EggConfig, prefill_content: str)
     """
     prompt_content = ""
     # Create a temporary file with the prefill content
-    with tempfile.NamedTemporaryFile(mode='w+', suffix=".txt", delete=False) as temp_file:
+    with tempfile.NamedTemporaryFile(mode='w+', encoding='utf-8', suffix=".txt", delete=False) as temp_file:
         temp_file_path = temp_file.name
         temp_file.write(prefill_content)
 
@@ -124,7 +300,7 @@ def get_prompt_from_editor_with_prefill(config: EggConfig, prefill_content: str)
         subprocess.run(command, shell=True, check=True)
 
         # Read the content after editing
-        with open(temp_file_path, 'r') as file:
+        with open(temp_file_path, 'r', encoding='utf-8') as file:
             prompt_content = file.read()
 
         return prompt_content
@@ -149,16 +325,13 @@ def get_editor_command(config: EggConfig) -> str:
     else:
         return "nano"
 
-def get_formatted_response_with_syntax_highlighting(color_scheme: str, response: str) -> str:
+@functools.lru_cache(maxsize=8)
+def get_terminal_formatter(color_scheme: str) -> "pygments.formatters.TerminalFormatter":
     """
-    Returns the response with syntax-highlighted code blocks as a formatted string,
-    utilizing the extract_code_blocks function to parse code blocks.
+    Returns the terminal formatter for the color scheme. Formatters are created once per scheme and reused.
     """
-    output = io.StringIO()
-    last_end = 0
-
-    # Extract code blocks along with their positions and fences
-    code_blocks = extract_code_blocks(response)
+    import pygments.formatters
+    from pygments.styles import get_style_by_name
 
     # Get the Pygments style based on the color scheme
     try:
@@ -168,50 +341,156 @@ def get_formatted_response_with_syntax_highlighting(color_scheme: str, response:
         pygments_style = get_style_by_name("monokai")
 
     # Create a formatter with the specified style
-    formatter = pygments.formatters.TerminalFormatter(style=pygments_style)
+    return pygments.formatters.TerminalFormatter(style=pygments_style)
+
+@functools.lru_cache(maxsize=64)
+def get_lexer_for_language(language: str) -> Optional["Lexer"]:
+    """
+    Returns the lexer for a code block language tag, or None if Pygments does not know the language.
+
+    Lexers are looked up once per language and reused, as the lookup walks the Pygments lexer registry.
+    """
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+
+    try:
+        return get_lexer_by_name(language.lower())
+    except ClassNotFound:
+        return None
+
+def guess_lexer_for_code(code: str) -> "Lexer":
+    """
+    Returns the lexer Pygments guesses for a code block without a language tag.
+
+    Guessing runs the text analysis of every known lexer, so the result is remembered
+    per code content. Tiny snippets are treated as plain text.
+    """
+    from pygments.lexers import guess_lexer
+    from pygments.lexers.special import TextLexer
+
+    if len(code) < MIN_GUESS_LEXER_LENGTH:
+        return TextLexer()
+
+    key = hash(code)
+    lexer = _guessed_lexers.get(key)
+    if lexer is not None:
+        _guessed_lexers.move_to_end(key)
+        return lexer
+
+    try:
+        lexer = guess_lexer(code)
+    except Exception:
+        lexer = TextLexer()
+    _guessed_lexers[key] = lexer
+    if len(_guessed_lexers) > GUESS_LEXER_CACHE_SIZE:
+        _guessed_lexers.popitem(last=False)
+    return lexer
+
+def iter_formatted_response_with_syntax_highlighting(color_scheme: str, response: str) -> Iterator[str]:
+    """
+    Yields the response with syntax-highlighted code blocks piece by piece,
+    utilizing the extract_code_blocks function to parse code blocks.
+
+    Consumers that write the pieces out as they come, like pipe_output_via_pager,
+    never need to hold the complete formatted response in memory.
+    """
+    # Extract code blocks along with their positions and fences
+    code_blocks = extract_code_blocks(response)
+    if not code_blocks:
+        # plain prose, nothing to highlight
+        yield response
+        return
+
+    import pygments
+
+    last_end = 0
 
     for fence, actual_lang, actual_path, code, start, end in code_blocks:
-        # Append text before the code block
-        output.write(response[last_end:start])
+        # Text before the code block
+        yield response[last_end:start]
 
         # Reconstruct the opening fence with optional language and path
         lang_path = ';'.join(filter(None, [actual_lang, actual_path]))
-        output.write(f"{fence}{lang_path}\n")
+        yield f"{fence}{lang_path}\n"
 
-        # Determine the lexer to use for syntax highlighting
-        if actual_lang:
-            try:
-                lexer = get_lexer_by_name(actual_lang.lower())
-            except Exception:
-                lexer = guess_lexer(code)
+        if (actual_lang.lower() in PLAIN_TEXT_LANGUAGES
+                or (not actual_lang and len(code) < MIN_GUESS_LEXER_LENGTH)):
+            # Plain text, render it the way Pygments' TextLexer would without going through Pygments
+            yield code.strip("\n") + "\n"
         else:
-            try:
-                lexer = guess_lexer(code)
-            except Exception:
-                lexer = TextLexer()
+            # Determine the lexer to use for syntax highlighting
+            lexer = get_lexer_for_language(actual_lang) if actual_lang else None
+            if lexer is None:
+                lexer = guess_lexer_for_code(code)
 
-        # Syntax-highlight the code content, output as ANSI text
-        formatted_code = pygments.highlight(code, lexer, formatter)
+            # Syntax-highlight the code content as ANSI text
+            yield pygments.highlight(code, lexer, get_terminal_formatter(color_scheme))
 
-        output.write(formatted_code)
-
-        # Append the closing fence
-        output.write(f"\n{fence}\n")
+        # The closing fence
+        yield f"\n{fence}\n"
 
         last_end = end
 
-    # Append any remaining text after the last code block
-    output.write(response[last_end:])
+    # Any remaining text after the last code block
+    yield response[last_end:]
 
-    return output.getvalue()
+def get_formatted_response_with_syntax_highlighting(color_scheme: str, response: str) -> str:
+    """
+    Returns the response with syntax-highlighted code blocks as a formatted string.
+    """
+    return "".join(iter_formatted_response_with_syntax_highlighting(color_scheme, response))
 
-def pipe_output_via_pager(output_str: str) -> None:
+@functools.lru_cache(maxsize=1)
+def is_output_to_terminal() -> bool:
     """
-    Pipes the given string to a pager like 'less', retaining colors.
+    Returns True if standard output is a terminal. The result is cached for the lifetime of the process.
     """
+    return sys.stdout.isatty()
+
+def _write_to_stdout(pieces: Iterable[str]) -> None:
+    write = sys.stdout.write
+    for piece in pieces:
+        write(piece)
+    sys.stdout.flush()
+
+def pipe_output_via_pager(output: Union[str, Iterable[str]]) -> None:
+    """
+    Pipes the given string, or the strings produced by an iterable, to a pager like 'less', retaining colors.
+    If the output is not going to a terminal, or fits on the screen, it is written directly to stdout instead.
+    """
+    pieces = [output] if isinstance(output, str) else output
+
+    if not is_output_to_terminal():
+        _write_to_stdout(pieces)
+        return
+
+    # Output that fits on the screen is written directly, sparing the pager process
+    pieces = iter(pieces)
+    columns, rows = shutil.get_terminal_size()
+    head: List[str] = []
+    lines = 0
+    for piece in pieces:
+        head.append(piece)
+        # escape codes make this overestimate wrapped lines, which errs on the side of paging
+        lines += piece.count("\n") + len(piece) // columns
+        if lines >= rows - 1:
+            break
+    else:
+        _write_to_stdout(head)
+        return
+    pieces = itertools.chain(head, pieces)
+
     pager_command = os.environ.get('PAGER', 'less -R -E -X')
     with subprocess.Popen(pager_command, shell=True, stdin=subprocess.PIPE) as pager:
         if pager.stdin is not None:
-            pager.stdin.write(output_str.encode('utf-8'))
-            pager.stdin.close()
+            try:
+                for piece in pieces:
+                    # Encode and write in slices so we never hold a second full copy of the output
+                    for start in range(0, len(piece), PAGER_WRITE_CHUNK_SIZE):
+                        pager.stdin.write(piece[start:start + PAGER_WRITE_CHUNK_SIZE].encode('utf-8'))
+                pager.stdin.close()
+            except BrokenPipeError:
+                # The user quit the pager before reading all of the output; drop the rest
+                with contextlib.suppress(BrokenPipeError):
+                    pager.stdin.close()
         pager.wait()
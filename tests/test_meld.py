@@ -0,0 +1,83 @@
+import signal
+import threading
+import time
+
+import pytest
+
+from eigengen import meld
+from eigengen.providers import Model
+from tests.fixtures.mock_provider import MockProvider
+
+
+class MeldProvider(MockProvider):
+    """Answers a meld request with new content that names the melded file."""
+
+    def __init__(self, before_answer=None):
+        super().__init__()
+        self.before_answer = before_answer
+        self.requested = []
+
+    def make_request(self, model, messages, max_tokens, temperature, _=None):
+        filepath = messages[-1]["content"].split("original ")[1].split(".\n")[0]
+        self.requested.append(filepath)
+        if self.before_answer is not None:
+            self.before_answer(filepath)
+        yield f"```python;{filepath}\nnew {filepath}\n```"
+
+
+def meld_response(*filepaths):
+    return "\n".join(f"```python;{filepath}\nchanged {filepath}\n```" for filepath in filepaths)
+
+
+def test_meld_files_requests_files_concurrently_and_reviews_in_order(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "a.py").write_text("old a.py\n", encoding="utf-8")
+    reviewed = []
+    monkeypatch.setattr(meld, "review_meld", lambda filepath, diff: reviewed.append((filepath, diff)))
+
+    # both requests must be running at the same time to get past the barrier,
+    # and the first file is answered last
+    barrier = threading.Barrier(2, timeout=5)
+    def before_answer(filepath):
+        barrier.wait()
+        if filepath == "a.py":
+            time.sleep(0.05)
+
+    provider = MeldProvider(before_answer)
+    meld.meld_files(Model(provider, "mock", 0.7, 100), ["a.py", "b.py", "c.py"], meld_response("a.py", "b.py"))
+
+    assert "No code block found for file: c.py" in capsys.readouterr().out
+    assert sorted(provider.requested) == ["a.py", "b.py"]
+    assert [filepath for filepath, _ in reviewed] == ["a.py", "b.py"]
+    assert "-old a.py\n+new a.py" in reviewed[0][1]
+    assert "+new b.py" in reviewed[1][1]
+
+
+def test_meld_files_cancels_queued_requests_on_ctrl_c(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(meld, "MAX_CONCURRENT_MELDS", 2)
+    monkeypatch.setattr(meld, "review_meld", lambda filepath, diff: pytest.fail("nothing should be reviewed"))
+
+    main_thread = threading.main_thread().ident
+    started = threading.Barrier(2, timeout=5)
+    release = threading.Event()
+    def before_answer(filepath):
+        started.wait()
+        if filepath == "a.py":
+            # Ctrl+C while the main thread waits for the results, repeated in case
+            # the signal arrived just before the main thread started waiting
+            while not release.wait(0.1):
+                signal.pthread_kill(main_thread, signal.SIGINT)
+        release.wait(5)
+
+    provider = MeldProvider(before_answer)
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            meld.meld_files(Model(provider, "mock", 0.7, 100), ["a.py", "b.py", "c.py"],
+                            meld_response("a.py", "b.py", "c.py"))
+    finally:
+        release.set()
+
+    # the request still waiting for a worker was cancelled and never sent
+    time.sleep(0.05)
+    assert sorted(provider.requested) == ["a.py", "b.py"]
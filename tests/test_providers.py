@@ -1,6 +1,7 @@
 import pytest
 from typing import List, Dict
 from eigengen import operations, providers, prompts
+from eigengen.ratelimit import TokenBucket
 from tests.fixtures.mock_provider import MockProvider, create_mock_model_pair
 
 def test_mock_provider_default_mode(monkeypatch):
@@ -44,5 +45,41 @@ def test_mock_provider_unknown_prompt(monkeypatch):
 
     assert final_answer == "I don't have a canned response for that prompt."
 
+class FlakyProvider(MockProvider):
+    def __init__(self, fail_after_output: bool):
+        super().__init__()
+        self.fail_after_output = fail_after_output
+        self.calls = 0
+
+    @providers.retry_on_rate_limit(lambda: (ConnectionError,))
+    def make_request(self, model, messages, max_tokens, temperature, _=None):
+        self.calls += 1
+        if self.calls == 1 and not self.fail_after_output:
+            raise ConnectionError()
+        yield "partial"
+        if self.fail_after_output:
+            raise ConnectionError()
+
+def test_retry_on_rate_limit_retries_only_before_output(monkeypatch):
+    monkeypatch.setattr(providers.time, "sleep", lambda _: None)
+
+    provider = FlakyProvider(fail_after_output=False)
+    assert list(provider.make_request("mock", [], 100, 0.7)) == ["partial"]
+    assert provider.calls == 2
+
+    provider = FlakyProvider(fail_after_output=True)
+    with pytest.raises(ConnectionError):
+        list(provider.make_request("mock", [], 100, 0.7))
+    assert provider.calls == 1
+
+def test_retry_on_rate_limit_throttles_every_attempt(monkeypatch):
+    monkeypatch.setattr(providers.time, "sleep", lambda _: None)
+
+    provider = FlakyProvider(fail_after_output=False)
+    provider.rate_limiter = TokenBucket(rate=0.001, capacity=2)
+    assert list(provider.make_request("mock", [], 100, 0.7)) == ["partial"]
+    # the failed attempt and the retry both took a token
+    assert not provider.rate_limiter.try_acquire()
+
 if __name__ == "__main__":
     pytest.main([__file__])
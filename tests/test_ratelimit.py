@@ -0,0 +1,43 @@
+import json
+import time
+
+from eigengen import providers
+from eigengen.config import EggConfig
+from eigengen.ratelimit import TokenBucket
+
+
+def test_token_bucket_limits_burst():
+    bucket = TokenBucket(rate=0.001, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_refills():
+    bucket = TokenBucket(rate=100, capacity=1)
+    bucket.acquire()
+    assert not bucket.try_acquire()
+    time.sleep(0.02)
+    assert bucket.try_acquire()
+
+
+def test_rate_limits_are_opt_in():
+    assert providers.get_rate_limiter("google") is None
+    providers.set_rate_limits({"google": 10, "openai": 0})
+    try:
+        assert providers.get_rate_limiter("google") is not None
+        assert providers.get_rate_limiter("openai") is None
+    finally:
+        providers.set_rate_limits({})
+
+
+def test_config_drops_invalid_rate_limits(tmp_path, capsys):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({"requests_per_minute": {"google": 10, "openai": "10", "groq": 0, "mistral": True}}))
+    assert EggConfig.load_config(str(config_path)).requests_per_minute == {"google": 10}
+    assert "'openai'" in capsys.readouterr().out
+
+    config_path.write_text(json.dumps({"model": "groq", "requests_per_minute": None}))
+    config = EggConfig.load_config(str(config_path))
+    assert config.model == "groq"
+    assert config.requests_per_minute == {}
@@ -0,0 +1,43 @@
+import os
+
+from eigengen import utils
+
+
+def test_read_file_cached_detects_changes(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_text("first\n", encoding="utf-8")
+    assert utils.read_file_cached(str(path)) == "first\n"
+    assert utils.read_file_cached(str(path)) == "first\n"
+
+    path.write_text("second version\n", encoding="utf-8")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert utils.read_file_cached(str(path)) == "second version\n"
+
+
+
+def test_read_existing_files_uncached_reads_disk(tmp_path):
+    path = tmp_path / "example.py"
+    path.write_text("first\n", encoding="utf-8")
+    st = os.stat(path)
+    assert utils.read_existing_files([str(path)]) == [(str(path), "first\n")]
+
+    # same size and modification time, the cache cannot tell the file changed
+    path.write_text("other\n", encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    missing = str(tmp_path / "missing.py")
+    assert utils.read_existing_files([str(path), missing], cached=False) == [(str(path), "other\n")]
+
+def test_quote_text_matches_line_quoting():
+    for text in ["", "a", "a\n", "a\nb\n", "a\n\nb\n\n", "\n"]:
+        assert utils.quote_text(text) == "\n".join(f"> {line}" for line in text.splitlines())
+
+
+def test_unique_paths_keeps_first_occurrence():
+    assert utils.unique_paths(["a.py", "./a.py", "b.py", "a.py"]) == ["a.py", "b.py"]
+
+
+def test_read_file_content_normalizes_line_endings(tmp_path):
+    path = tmp_path / "crlf.py"
+    path.write_bytes(b"a\r\nb\rc\n")
+    assert utils.read_file_content(str(path)) == "a\nb\nc\n"